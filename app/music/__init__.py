@@ -1,11 +1,20 @@
+import collections
+import gc
+import math
 import os
+import queue
+import sys
 import threading
 import time
-from typing import Any, Dict, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
+import numpy as np
 import scamp as sc
 from scamp_extensions.pitch import Scale
 
+if TYPE_CHECKING:
+    from app.vision import HandFrame
+
 SCALES = {
     "major": Scale.major,  # first scale == default scale
     "aeolian": Scale.aeolian,
@@ -26,10 +35,37 @@ SCALES = {
     "phrygian": Scale.phrygian,
     "whole_tone": Scale.whole_tone,
 }
+SCALE_NAMES = tuple(SCALES)  # in menu order
 
 DEFAULT_GLIDE_MODE = False
 PITCH_X_MARGIN = 0.01  # 1% margin on the right
 
+# Horizontal band of the frame mapped to pitch (normalized x)
+PITCH_REGION_START = 0.5
+PITCH_REGION_END = 1.0 - PITCH_X_MARGIN
+PITCH_REGION_WIDTH = PITCH_REGION_END - PITCH_REGION_START
+# (pitches as floats, last index, note blocks per unit of x) for a pitch pool
+PitchLookup = Tuple[List[float], int, float]
+HAND_MOVE_EPSILON = 1e-4  # normalized hand movement treated as "unchanged"
+
+# Audio loop wake-up timeouts (seconds)
+ACTIVE_WAIT_TIMEOUT = 0.02  # keep smoothing / retriggering while hands are present
+IDLE_WAIT_TIMEOUT = 0.25  # nothing to do until new hand data arrives
+
+# Minimum parameter change worth sending to a playing note
+PITCH_CHANGE_EPSILON = 0.01  # ~1 cent
+VOLUME_CHANGE_EPSILON = 1 / 128  # below MIDI CC resolution
+
+MIDI_QUEUE_SIZE = 8  # pending note commands before new ones are refused
+MIDI_SEND_TIMEOUT = 0.5  # seconds the UI thread waits for room in the queue
+
+LOG_QUEUE_SIZE = 256  # buffered log messages before the oldest are dropped
+LOG_DRAIN_INTERVAL = 0.05  # seconds
+
+NOTE_RELEASE_TIMEOUT = 5.0  # seconds a muted glide note is held before ending
+
+AUDIO_THREAD_RT_PRIORITY = 20  # SCHED_FIFO priority on Linux (1-99)
+
 INSTRUMENTS = [
     "Marimba",
     "Vibraphone",
@@ -46,71 +82,254 @@ GLIDE_MODE_INSTRUMENT = "Sine Wave"
 
 
 def get_scale_names():
-    return list(SCALES.keys())
+    return SCALE_NAMES
+
+
+# One-pole smoothing coefficients keyed by (dt in 0.5 ms steps, taus)
+_SMOOTHING_ALPHA_CACHE: Dict[Tuple[int, float, float], Tuple[float, float]] = {}
+
+
+def _smoothing_alpha(dt: float, tau: float) -> float:
+    """Smoothing coefficient for a time step of dt seconds and time constant tau.
+
+    Keeps the glide rate the same however irregularly the audio loop runs.
+    """
+    if tau <= 0.0 or dt >= 10.0 * tau:
+        return 1.0  # no smoothing, or the gap is long enough to settle fully
+    return 1.0 - math.exp(-dt / tau)
+
+
+def _smooth_step(
+    cur_pitch: float,
+    tgt_pitch: float,
+    cur_volume: float,
+    tgt_volume: float,
+    dt: float,
+    pitch_tau: float,
+    volume_tau: float,
+    volume_threshold: float,
+) -> Tuple[float, float, bool]:
+    """Advance pitch and volume smoothing by dt seconds.
+
+    Returns the new pitch and volume, and whether the volume is above the
+    threshold needed to sound a note.
+    """
+    if dt >= 10.0 * max(pitch_tau, volume_tau):
+        pitch_alpha = volume_alpha = 1.0
+    else:
+        key = (round(dt * 2000.0), pitch_tau, volume_tau)
+        alphas = _SMOOTHING_ALPHA_CACHE.get(key)
+        if alphas is None:
+            step_dt = key[0] / 2000.0
+            alphas = (
+                _smoothing_alpha(step_dt, pitch_tau),
+                _smoothing_alpha(step_dt, volume_tau),
+            )
+            _SMOOTHING_ALPHA_CACHE[key] = alphas
+        pitch_alpha, volume_alpha = alphas
+
+    cur_pitch += (tgt_pitch - cur_pitch) * pitch_alpha
+    cur_volume += (tgt_volume - cur_volume) * volume_alpha
+    return cur_pitch, cur_volume, cur_volume > volume_threshold
+
+
+def _raise_thread_priority():
+    """Ask the OS to schedule the calling thread ahead of normal work.
+
+    Raises OSError (or AttributeError where the call is missing) if the
+    platform or permissions don't allow it.
+    """
+    if sys.platform.startswith("linux"):
+        # pid 0 is the calling thread
+        os.sched_setscheduler(
+            0, os.SCHED_FIFO, os.sched_param(AUDIO_THREAD_RT_PRIORITY)
+        )
+    elif sys.platform == "win32":
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        THREAD_PRIORITY_TIME_CRITICAL = 15
+        if not kernel32.SetThreadPriority(
+            kernel32.GetCurrentThread(), THREAD_PRIORITY_TIME_CRITICAL
+        ):
+            raise ctypes.WinError()
+    elif sys.platform == "darwin":
+        import ctypes
+
+        QOS_CLASS_USER_INTERACTIVE = 0x21
+        libc = ctypes.CDLL("/usr/lib/libSystem.dylib")
+        err = libc.pthread_set_qos_class_self_np(QOS_CLASS_USER_INTERACTIVE, 0)
+        if err:
+            raise OSError(err, os.strerror(err))
 
 
 # Paths to sound fonts
 current_dir = os.path.dirname(os.path.abspath(__file__))
 soundFontPath_7777777 = os.path.join(current_dir, "soundFonts", "7777777.sf2")
+SOUNDFONT_7777777_EXISTS = os.path.isfile(soundFontPath_7777777)  # checked once
 
 
 class VelomaInstrument:
     """Virtual Theremin-like instrument using SCAMP with real-time parameter control."""
 
+    __slots__ = (
+        "session",
+        "theremin",
+        "current_pitch",
+        "current_volume",
+        "target_pitch",
+        "target_volume",
+        "current_note",
+        "is_note_playing",
+        "_note_state_lock",
+        "is_note_muted",
+        "_note_muted_ns",
+        "_last_sent_pitch",
+        "_last_sent_volume",
+        "glide_mode",
+        "start_key",
+        "octave_range",
+        "scale_name",
+        "_pitch_pool_cache",
+        "pitch_pool",
+        "_pitch_lookup",
+        "pitch_range",
+        "volume_range",
+        "_pitch_scale",
+        "_pitch_offset",
+        "_volume_scale",
+        "_volume_offset",
+        "pitch_smoothing_tau",
+        "volume_smoothing_tau",
+        "audio_thread",
+        "should_stop",
+        "_param_dirty",
+        "_midi_thread",
+        "_midi_cmd_q",
+        "_pending_change",
+        "_pending_change_lock",
+        "_note_generation",
+        "_log_thread",
+        "_log_stop",
+        "_log_q",
+        "hands_detected",
+        "min_volume_threshold",
+        "note_play_cooldown",
+        "last_note_time_ns",
+        "last_note_index",
+        "last_trigger_state",
+        "last_pitch_x",
+        "right_hand_trigger",
+        "_prev_hand_input",
+        "_latest",
+    )
+
     def __init__(self):
+        if not SOUNDFONT_7777777_EXISTS:
+            raise FileNotFoundError(f"SoundFont not found: {soundFontPath_7777777}")
+
         self.session = sc.Session()
         self.session.tempo = 120
 
         self.theremin = self.session.new_part(INSTRUMENTS[0])
-        self.theremin.send_midi_cc(64, 0)  # Sustain pedal off
+        self._init_part_controllers()
 
         self.current_pitch = 60  # Middle C
         self.current_volume = 0.5
         self.target_pitch = 60.0
         self.target_volume = 0.5
 
-        self.current_notes = []  # hold all active notes
-        self.num_amplified_notes = 3  # number of notes playing at the same time
+        self.current_note = None  # held note in glide mode
         self.is_note_playing = False
+        # Held while starting a note or while the MIDI thread ends one for an
+        # instrument swap, so is_note_playing and current_note can't disagree
+        self._note_state_lock = threading.Lock()
+        self.is_note_muted = False  # held at zero volume, ready to resume
+        self._note_muted_ns = 0  # time.monotonic_ns() when muted
+        self._last_sent_pitch = math.nan
+        self._last_sent_volume = math.nan
 
         self.glide_mode = DEFAULT_GLIDE_MODE
         self.start_key = 60.0
         self.octave_range = 1
 
         self.scale_name = "major"
-        self.pitch_pool = self._generate_pitch_pool(self.scale_name)
+        # (scale, start key, octaves) -> pitch pool and its note lookup
+        self._pitch_pool_cache: Dict[
+            Tuple[str, float, int], Tuple[np.ndarray, PitchLookup]
+        ] = {}
+        self._rebuild_pitch_pool()
 
         self.pitch_range = (
             self.start_key,
             self.start_key + self.octave_range * 12,
         )  # 12 semitones per octave
         self.volume_range = (0.0, 1.0)
+        self._update_range_mapping()
 
-        # Smoothing parameters
-        self.pitch_smoothing = 1
-        self.volume_smoothing = 1
+        # Smoothing time constants (seconds)
+        self.pitch_smoothing_tau = 0.02
+        self.volume_smoothing_tau = 0.01
 
         # Threading
         self.audio_thread = None
         self.should_stop = False
+        self._param_dirty = threading.Event()  # set when vision data arrives
+        self._midi_thread = None
+        self._midi_cmd_q = queue.Queue(maxsize=MIDI_QUEUE_SIZE)
+        # Pitch/volume change waiting for the MIDI thread; newer updates are
+        # merged into it instead of queueing another command
+        self._pending_change: Optional[Tuple[Optional[float], Optional[float]]] = None
+        self._pending_change_lock = threading.Lock()
+        self._note_generation = 0  # bumped whenever a note starts or ends
+        self._log_thread = None
+        self._log_stop = threading.Event()
+        self._log_q = collections.deque(maxlen=LOG_QUEUE_SIZE)
         self.hands_detected = False
         self.min_volume_threshold = 0.3  # minimum volume to start / maintain note
 
         # Beginner mode
-        self.note_played_recently = False
         self.note_play_cooldown = 0.2  # seconds
-        self.last_note_time = 0
+        self.last_note_time_ns = 0  # time.monotonic_ns() of the last note
         self.last_note_index = None
+        self.last_trigger_state = False
         self.last_pitch_x = None
         self.right_hand_trigger = False
+        # (pitch_x, volume_y, trigger, glide_mode) last mapped to targets
+        self._prev_hand_input = None
+
+        # Latest vision state handed to the audio thread as one tuple so it is
+        # always read consistently: (pitch, volume, hands, pitch_x, trigger)
+        self._latest = (
+            self.target_pitch,
+            self.target_volume,
+            self.hands_detected,
+            self.last_pitch_x,
+            self.right_hand_trigger,
+        )
 
     def start_audio(self):
         """Start the audio processing thread."""
         if self.audio_thread and self.audio_thread.is_alive():
             return
 
-        self.theremin.send_midi_cc(64, 0)
         self.should_stop = False
+
+        # Move everything allocated during startup (Qt, MediaPipe, SCAMP) out
+        # of the collector's reach so GC passes during playback stay short
+        gc.freeze()
+
+        if not (self._log_thread and self._log_thread.is_alive()):
+            self._log_stop.clear()
+            self._log_thread = threading.Thread(target=self._log_loop)
+            self._log_thread.daemon = True
+            self._log_thread.start()
+
+        if not (self._midi_thread and self._midi_thread.is_alive()):
+            self._midi_thread = threading.Thread(target=self._midi_loop)
+            self._midi_thread.daemon = True
+            self._midi_thread.start()
+
         self.audio_thread = threading.Thread(target=self._audio_loop)
         self.audio_thread.daemon = True
         self.audio_thread.start()
@@ -118,94 +337,167 @@ class VelomaInstrument:
     def stop_audio(self):
         """Stop the audio processing."""
         self.should_stop = True
+        self._param_dirty.set()  # wake the audio loop so it can exit
         self._stop_current_note()
-        self.theremin.send_midi_cc(64, 0)
 
         if self.audio_thread:
             self.audio_thread.join(timeout=1.0)
+            if self.audio_thread.is_alive():
+                self._log("Audio thread did not stop in time; silencing notes")
+                self.theremin.end_all_notes()
 
-    def update_from_vision(self, hand_data: Optional[Dict[str, Any]]):
-        if not hand_data or not hand_data.get("hands"):
-            self.hands_detected = False
-            self.right_hand_trigger = False
+        if self._midi_thread:
+            try:
+                self._midi_cmd_q.put_nowait(None)  # drain pending, then exit
+            except queue.Full:
+                # The MIDI thread is stuck: don't wait on it, drop its backlog
+                # and silence notes from here
+                self._log("MIDI thread is not keeping up; silencing notes")
+                self._discard_midi_commands()
+                self._silence_notes()
+            else:
+                self._midi_thread.join(timeout=1.0)
+                if self._midi_thread.is_alive():
+                    self._log("MIDI thread did not stop in time; silencing notes")
+                    self._silence_notes()
+            self._midi_thread = None
+            # A note-off refused while the queue was full now runs inline
+            self._stop_current_note()
+
+        if self._log_thread:
+            self._log_stop.set()  # flushes anything still buffered
+            self._log_thread.join(timeout=1.0)
+            self._log_thread = None
+
+    def update_from_vision(self, hand_data: Optional["HandFrame"]):
+        if not hand_data or not hand_data.hands:
+            # Only losing the hands is news; further empty frames change nothing
+            if self.hands_detected:
+                self.hands_detected = False
+                self.right_hand_trigger = False
+                self._prev_hand_input = None
+                self._publish_vision_state()
             return
 
-        hands = hand_data["hands"]
+        hands = hand_data.hands
         self.hands_detected = True
-
-        region_start = 0.5
-        region_end = 1.0 - PITCH_X_MARGIN
-        num_notes = len(self.pitch_pool)
-        region_width = region_end - region_start
-        block_width = region_width / num_notes
-
-        if len(hands) >= 1:
-            primary_hand = hands[0]
-            pitch_x = primary_hand.get("rightmost_x", primary_hand["palm_center"][0])
-            self.last_pitch_x = pitch_x
-
-            self.right_hand_trigger = primary_hand.get("trigger_gesture", False)
-
-            if self.glide_mode:
-                self.target_pitch = self._map_range(
-                    pitch_x, region_start, region_end, *self.pitch_range
-                )
+        if len(hands) >= 2:
+            # Right hand sets pitch, left hand sets volume
+            hand0, hand1 = hands[0], hands[1]
+            if hand0.palm_center[0] > hand1.palm_center[0]:
+                pitch_hand, volume_hand = hand0, hand1
             else:
-                x = max(region_start, min(region_end, pitch_x))
-                mapped_index = int((x - region_start) / block_width)
-                mapped_index = min(mapped_index, num_notes - 1)
-                self.target_pitch = self.pitch_pool[mapped_index]
-
-            self.target_volume = self._map_range(
-                1.0 - primary_hand["palm_center"][1], 0.0, 0.5, *self.volume_range
-            )
+                pitch_hand, volume_hand = hand1, hand0
+            volume_y = volume_hand.palm_center[1]
+        else:
+            pitch_hand = hands[0]
+            volume_y = pitch_hand.palm_center[1]
+
+        pitch_x = pitch_hand.rightmost_x
+        triggered = pitch_hand.trigger_gesture
+        glide_mode = self.glide_mode
+
+        # A still hand maps to the same targets: skip remapping and waking
+        # the audio loop
+        prev = self._prev_hand_input
+        if (
+            prev is not None
+            and prev[2] == triggered
+            and prev[3] == glide_mode
+            and abs(pitch_x - prev[0]) < HAND_MOVE_EPSILON
+            and abs(volume_y - prev[1]) < HAND_MOVE_EPSILON
+        ):
+            return
+        self._prev_hand_input = (pitch_x, volume_y, triggered, glide_mode)
 
-            if len(hands) >= 2:
-                if hands[0]["palm_center"][0] > hands[1]["palm_center"][0]:
-                    right_hand = hands[0]
-                    left_hand = hands[1]
-                else:
-                    right_hand = hands[1]
-                    left_hand = hands[0]
+        self.last_pitch_x = pitch_x
+        self.right_hand_trigger = triggered
 
-                pitch_x = right_hand.get("rightmost_x", right_hand["palm_center"][0])
-                volume_y = left_hand["palm_center"][1]
+        if glide_mode:
+            self.target_pitch = self._map_pitch(pitch_x)
+        else:
+            values, max_idx, blocks_per_x = self._pitch_lookup
+            self.target_pitch = values[self._note_index(pitch_x, blocks_per_x, max_idx)]
 
-                self.last_pitch_x = pitch_x
-                self.right_hand_trigger = right_hand.get("trigger_gesture", False)
+        self.target_volume = self._map_volume(volume_y)
 
-                if self.glide_mode:
-                    self.target_pitch = self._map_range(
-                        pitch_x, region_start, region_end, *self.pitch_range
-                    )
-                else:
-                    x = max(region_start, min(region_end, pitch_x))
-                    mapped_index = int((x - region_start) / block_width)
-                    mapped_index = min(mapped_index, num_notes - 1)
-                    self.target_pitch = self.pitch_pool[mapped_index]
+        self._publish_vision_state()
 
-                self.target_volume = self._map_range(
-                    1.0 - volume_y, 0.0, 0.5, *self.volume_range
-                )
-        else:
-            self.right_hand_trigger = False
+    def _publish_vision_state(self):
+        """Hand the latest targets to the audio thread and wake it."""
+        self._latest = (
+            self.target_pitch,
+            self.target_volume,
+            self.hands_detected,
+            self.last_pitch_x,
+            self.right_hand_trigger,
+        )
+        self._param_dirty.set()
 
     def _audio_loop(self):
         """Main audio processing loop with real-time parameter updates."""
-        region_start = 0.5
-        region_end = 1.0 - PITCH_X_MARGIN
+        try:
+            _raise_thread_priority()
+        except (OSError, AttributeError) as e:
+            self._log(f"Audio thread running at normal priority: {e}")
+
+        region_start = PITCH_REGION_START
+        step = _smooth_step
+        param_dirty = self._param_dirty
+        monotonic_ns = time.monotonic_ns
+        note_index_for = self._note_index
+        # Tuning fixed for the lifetime of the loop; self.theremin is not cached
+        # because set_instrument swaps it while running
+        pitch_tau = self.pitch_smoothing_tau
+        volume_tau = self.volume_smoothing_tau
+        volume_threshold = self.min_volume_threshold
+        cooldown_ns = int(self.note_play_cooldown * 1e9)
+        release_ns = int(NOTE_RELEASE_TIMEOUT * 1e9)
+        prev_ns = monotonic_ns()
+        retrigger_at_ns = None  # when a note held back by the cooldown may play
+        settled = False  # smoothing has caught up with the last targets
 
         while not self.should_stop:
-            # Smooth parameter transitions
-            self.current_pitch = self._smooth_value(
-                self.current_pitch, self.target_pitch, self.pitch_smoothing
-            )
-            self.current_volume = self._smooth_value(
-                self.current_volume, self.target_volume, self.volume_smoothing
+            # Block until new vision data arrives. Glide mode also wakes
+            # periodically while the held note is still gliding towards its
+            # targets; beginner mode only needs to wake when a cooldown expires.
+            if self.glide_mode:
+                timeout = (
+                    ACTIVE_WAIT_TIMEOUT
+                    if (self.hands_detected or self.is_note_playing) and not settled
+                    else IDLE_WAIT_TIMEOUT
+                )
+            elif retrigger_at_ns is not None:
+                timeout = max(0.0, (retrigger_at_ns - monotonic_ns()) * 1e-9)
+            else:
+                timeout = IDLE_WAIT_TIMEOUT
+            param_dirty.wait(timeout=timeout)
+            param_dirty.clear()
+            if self.should_stop:
+                break
+
+            target_pitch, target_volume, hands_detected, pitch_x, triggered = (
+                self._latest
             )
 
-            should_play = (
-                self.hands_detected and self.current_volume > self.min_volume_threshold
+            # Smooth parameter transitions over the time since the last pass
+            now = monotonic_ns()  # shared by everything below in this pass
+            dt = (now - prev_ns) * 1e-9
+            prev_ns = now
+            self.current_pitch, self.current_volume, loud_enough = step(
+                self.current_pitch,
+                target_pitch,
+                self.current_volume,
+                target_volume,
+                dt,
+                pitch_tau,
+                volume_tau,
+                volume_threshold,
+            )
+            should_play = hands_detected and loud_enough
+            settled = (
+                abs(target_pitch - self.current_pitch) < PITCH_CHANGE_EPSILON
+                and abs(target_volume - self.current_volume) < VOLUME_CHANGE_EPSILON
             )
 
             if self.glide_mode:
@@ -213,118 +505,325 @@ class VelomaInstrument:
                     if not self.is_note_playing:
                         self._start_continuous_note()
                     else:
+                        # Resuming a muted note is just a volume change
+                        self.is_note_muted = False
                         self._update_note_parameters()
                 else:
                     if self.is_note_playing:
-                        self._stop_current_note()
+                        # Keep the note alive through brief dips, and only end
+                        # it once it has been silent for a while
+                        if not self.is_note_muted:
+                            self._mute_current_note()
+                        elif now - self._note_muted_ns > release_ns:
+                            self._stop_current_note()
             else:
                 # Beginner mode: discrete notes
-                num_notes = len(self.pitch_pool)
-                region_width = region_end - region_start
-                block_width = region_width / num_notes
-
-                pitch_x = self.last_pitch_x
-                triggered = getattr(self, "right_hand_trigger", False)
+                retrigger_at_ns = None
                 if should_play and pitch_x is not None:
                     if pitch_x < region_start:
                         # Hand is left of the pitch region: reset and do not play
                         self.last_note_index = None
                     else:
-                        # Hand is inside the pitch region: map to note
-                        x = max(region_start, min(region_end, pitch_x))
-                        note_index = int((x - region_start) / block_width)
-                        note_index = min(note_index, num_notes - 1)
+                        # Hand is inside the pitch region: map to note. One
+                        # snapshot, so a pool rebuilt meanwhile can't mix in
+                        pitch_values, max_idx, blocks_per_x = self._pitch_lookup
+                        note_index = note_index_for(pitch_x, blocks_per_x, max_idx)
 
-                        now = time.time()
                         if (
-                            note_index is not None
-                            and (
-                                self.last_note_index is None
-                                or note_index != self.last_note_index
-                                or (triggered and not self.last_trigger_state)
-                            )
-                            and now - self.last_note_time > self.note_play_cooldown
+                            self.last_note_index is None
+                            or note_index != self.last_note_index
+                            or (triggered and not self.last_trigger_state)
                         ):
-                            self.theremin.play_note(
-                                self.pitch_pool[note_index], self.current_volume, 0.4
-                            )
-                            self.last_note_time = now
-                            self.last_note_index = note_index
+                            if now - self.last_note_time_ns > cooldown_ns:
+                                self.theremin.play_note(
+                                    pitch_values[note_index],
+                                    self.current_volume,
+                                    0.4,
+                                )
+                                self.last_note_time_ns = now
+                                self.last_note_index = note_index
+                            else:
+                                retrigger_at_ns = self.last_note_time_ns + cooldown_ns
                     self.last_trigger_state = triggered
                 else:
                     self.last_note_index = None
                     self.last_trigger_state = False
 
-            time.sleep(0.0001)
-
         self._stop_current_note()
 
+    def _midi_loop(self):
+        """Run queued SCAMP note commands off the audio thread."""
+        while True:
+            cmd = self._midi_cmd_q.get()
+            if cmd is None:
+                break
+            try:
+                cmd()
+            except Exception as e:
+                self._log(f"Error running MIDI command: {e}")
+            # SCAMP calls are pure Python and hold the GIL; give it up between
+            # commands so a queued burst doesn't hold off the vision thread
+            time.sleep(0)
+
+    def _log(self, msg: str):
+        """Log a message without blocking the calling thread on stdout."""
+        if self._log_thread and self._log_thread.is_alive():
+            self._log_q.append(msg)
+        else:
+            print(msg)
+
+    def _log_loop(self):
+        """Print buffered log messages off the audio and MIDI threads."""
+        log_q = self._log_q
+        while True:
+            stopping = self._log_stop.wait(timeout=LOG_DRAIN_INTERVAL)
+            while log_q:
+                print(log_q.popleft())
+            if stopping:
+                break
+
+    def _send_midi(self, cmd, timeout: float = 0.0) -> bool:
+        """Queue a note command for the MIDI thread.
+
+        Runs the command inline when the MIDI thread is not running. Waits at
+        most timeout seconds for room in the queue; returns False if the
+        command was dropped, so the caller can keep its state and retry.
+        """
+        if not (self._midi_thread and self._midi_thread.is_alive()):
+            cmd()
+            return True
+        try:
+            if timeout > 0.0:
+                self._midi_cmd_q.put(cmd, timeout=timeout)
+            else:
+                self._midi_cmd_q.put_nowait(cmd)
+        except queue.Full:
+            return False
+        return True
+
+    def _discard_midi_commands(self):
+        """Drop everything queued for the MIDI thread and leave it a stop marker."""
+        try:
+            while True:
+                self._midi_cmd_q.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            self._midi_cmd_q.put_nowait(None)
+        except queue.Full:
+            pass
+
+    def _silence_notes(self):
+        """End all notes directly, bypassing the MIDI thread."""
+        self._drop_pending_change()
+        self.is_note_playing = False
+        self.is_note_muted = False
+        self.current_note = None
+        self.theremin.end_all_notes()
+
     def _start_continuous_note(self):
         """Start a new continuous note."""
-        self.current_notes = []
-        for _ in range(self.num_amplified_notes):
-            note = self.theremin.start_note(
-                pitch=self.current_pitch, volume=self.current_volume
-            )
-            self.current_notes.append(note)
-
-        self.is_note_playing = True
+        pitch, volume = self.current_pitch, self.current_volume
+        with self._note_state_lock:
+            # A change still waiting for the MIDI thread was meant for the old note
+            self._drop_pending_change()
+            if not self._send_midi(lambda: self._midi_start_note(pitch, volume)):
+                return  # MIDI thread is behind; the next pass tries again
+
+            self._last_sent_pitch = pitch
+            self._last_sent_volume = volume
+            # Before an instrument swap queued behind the start can clear it
+            self.is_note_playing = True
 
     def _update_note_parameters(self):
         """Update parameters of the currently playing note."""
-        if self.current_notes and self.is_note_playing:
-            try:
-                for note in self.current_notes:
-                    note.change_pitch(self.current_pitch)
-                    note.change_volume(self.current_volume)
-            except Exception as e:
-                print(f"Error updating note parameters: {e}")
-                self._stop_current_note()
-
-    def _stop_current_note(self):
-        """Stop the currently playing note."""
-        if self.current_notes and self.is_note_playing:
-            try:
-                for note in self.current_notes:
-                    note.end()
-                self.current_notes = []
-                self.is_note_playing = False
-                self.theremin.send_midi_cc(64, 0)
-                self.theremin.end_all_notes()
-            except Exception as e:
-                print(f"Error stopping note: {e}")
-                self.current_notes = []
-                self.is_note_playing = False
-                self.theremin.end_all_notes()
+        if self.is_note_playing:
+            # Skip changes too small to be audible
+            pitch, volume = self.current_pitch, self.current_volume
+            send_pitch = abs(pitch - self._last_sent_pitch) > PITCH_CHANGE_EPSILON
+            send_volume = abs(volume - self._last_sent_volume) > VOLUME_CHANGE_EPSILON
+            if not (send_pitch or send_volume):
+                return
+
+            if not self._queue_note_change(
+                pitch if send_pitch else None, volume if send_volume else None
+            ):
+                return
+
+            if send_pitch:
+                self._last_sent_pitch = pitch
+            if send_volume:
+                self._last_sent_volume = volume
+
+    def _queue_note_change(
+        self, pitch: Optional[float], volume: Optional[float]
+    ) -> bool:
+        """Queue a pitch/volume change for the playing note.
+
+        Changes share one pending slot, so a newer one is merged into a change
+        the MIDI thread hasn't applied yet and always lands after it. Returns
+        False if the MIDI queue had no room for it.
+        """
+        with self._pending_change_lock:
+            pending = self._pending_change
+            generation = self._note_generation
+            if pending is not None:
+                # Still waiting to be applied: fold this update into it
+                if pitch is None:
+                    pitch = pending[0]
+                if volume is None:
+                    volume = pending[1]
+            self._pending_change = (pitch, volume)
+        if pending is None and not self._send_midi(
+            lambda: self._midi_apply_pending_change(generation)
+        ):
+            with self._pending_change_lock:
+                if self._note_generation == generation:
+                    self._pending_change = None
+            return False
+        return True
+
+    def _drop_pending_change(self):
+        """Forget the unapplied change when the note it was for goes away."""
+        with self._pending_change_lock:
+            self._pending_change = None
+            # Apply commands still queued for the old note become no-ops
+            self._note_generation += 1
+
+    def _mute_current_note(self):
+        """Silence the playing note without ending it."""
+        # Through the pending slot, so an unapplied change can't unmute it
+        if not self._queue_note_change(None, 0.0):
+            return
+        self._last_sent_volume = 0.0
+        self.is_note_muted = True
+        self._note_muted_ns = time.monotonic_ns()
+
+    def _stop_current_note(self, timeout: float = 0.0) -> bool:
+        """Stop the currently playing note.
+
+        Returns False if the MIDI queue had no room; the note is then still
+        considered playing, so a later call ends it.
+        """
+        if self.is_note_playing:
+            self._drop_pending_change()
+            if not self._send_midi(self._midi_end_note, timeout):
+                return False
+            self.is_note_playing = False
+            self.is_note_muted = False
+        return True
+
+    def _midi_start_note(self, pitch: float, volume: float):
+        self.current_note = self.theremin.start_note(pitch=pitch, volume=volume)
+
+    def _midi_apply_pending_change(self, generation: int):
+        with self._pending_change_lock:
+            if generation != self._note_generation:
+                return  # queued for a note that has since ended
+            change, self._pending_change = self._pending_change, None
+        if change is not None:
+            self._midi_change_note(*change)
+
+    def _midi_change_note(self, pitch: Optional[float], volume: Optional[float]):
+        if self.current_note is None:
+            return
+        try:
+            if pitch is not None:
+                self.current_note.change_pitch(pitch)
+            if volume is not None:
+                self.current_note.change_volume(volume)
+        except Exception as e:
+            self._log(f"Error updating note parameters: {e}")
+            self.is_note_playing = False
+            self._midi_end_note()
+
+    def _midi_end_note(self):
+        if self.current_note is None:
+            return
+        try:
+            self.current_note.end()
+            self.current_note = None
+            self.theremin.end_all_notes()
+        except Exception as e:
+            self._log(f"Error stopping note: {e}")
+            self.current_note = None
+            self.theremin.end_all_notes()
 
     def set_scale(self, scale_name: str):
-        if scale_name in SCALES:
+        if scale_name in SCALES and scale_name != self.scale_name:
             self.scale_name = scale_name
-            self.pitch_pool = self._generate_pitch_pool(scale_name)
+            self._rebuild_pitch_pool()
+
+    def _rebuild_pitch_pool(self):
+        """Regenerate the pitch pool for the current scale and range."""
+        key = (self.scale_name, self.start_key, self.octave_range)
+        cached = self._pitch_pool_cache.get(key)
+        if cached is None:
+            pitch_pool = self._generate_pitch_pool(self.scale_name)
+            num_notes = len(pitch_pool)
+            lookup = (
+                # Plain floats for per-frame lookups, no numpy scalar conversion
+                pitch_pool.tolist(),
+                num_notes - 1,
+                # Note blocks per unit of x across the pitch region; the same
+                # blocks main.py draws as note boundaries
+                num_notes / PITCH_REGION_WIDTH,
+            )
+            cached = (pitch_pool, lookup)
+            self._pitch_pool_cache[key] = cached
+
+        # Published as one tuple: vision and audio threads read it while the
+        # UI thread rebuilds
+        self.pitch_pool, self._pitch_lookup = cached
+        self._prev_hand_input = None  # same hand position, new targets
 
-    def _generate_pitch_pool(self, scale_name: str) -> list:
+    @staticmethod
+    def _note_index(pitch_x: float, blocks_per_x: float, max_idx: int) -> int:
+        """Index into the pitch pool of the note block under pitch_x."""
+        t = pitch_x - PITCH_REGION_START
+        if t <= 0:
+            return 0
+        return min(int(t * blocks_per_x), max_idx)
+
+    def _generate_pitch_pool(self, scale_name: str) -> np.ndarray:
         if scale_name == "chromatic":
             # All semitones in the range
-            return [self.start_key + i for i in range(self.octave_range * 12 + 1)]
+            return self.start_key + np.arange(
+                self.octave_range * 12 + 1, dtype=np.float32
+            )
         else:
-            pitch_pool = []
+            # No scale has more than one degree per semitone, so the range
+            # never needs more degrees than the chromatic one
             max_pitch = self.start_key + self.octave_range * 12.0
+            max_degrees = self.octave_range * 12 + 1
             scale = SCALES[scale_name](self.start_key)
-
-            i = 0
-            while True:
-                pitch = scale[i]
-
-                if pitch > max_pitch:
-                    break
-
-                pitch_pool.append(pitch)
-                i += 1
-
-            return pitch_pool
+            pitches = np.fromiter(
+                (scale[i] for i in range(max_degrees)),
+                dtype=np.float32,
+                count=max_degrees,
+            )
+            return pitches[pitches <= max_pitch]
 
     def set_instrument(self, instrument_name: str):
-        self._stop_current_note()
+        # Called from the UI thread, which can afford a short wait for room
+        swapped = self._stop_current_note(MIDI_SEND_TIMEOUT) and self._send_midi(
+            # Queued behind the note-off so the old part is done before the swap
+            lambda: self._midi_set_instrument(instrument_name),
+            MIDI_SEND_TIMEOUT,
+        )
+        if not swapped:
+            self._log(f"MIDI thread is not keeping up; {instrument_name} not set")
+
+    def _midi_set_instrument(self, instrument_name: str):
+        with self._note_state_lock:
+            if self.current_note is not None:
+                # The audio loop started a note after set_instrument()'s
+                # note-off; end it on the old part and let the loop start a
+                # fresh one
+                self._drop_pending_change()
+                self.is_note_playing = False
+                self.is_note_muted = False
+                self._midi_end_note()
         self.theremin.remove_soundfont_playback()
 
         if instrument_name == GLIDE_MODE_INSTRUMENT:
@@ -334,37 +833,52 @@ class VelomaInstrument:
         else:
             self.theremin = self.session.new_part(instrument_name)
 
-        self.theremin.send_midi_cc(64, 0)
-        self.is_note_playing = False
-        self.current_notes = []
+        self._init_part_controllers()
+
+    def _init_part_controllers(self):
+        """Send the one-off controller setup a freshly created part needs."""
+        self.theremin.send_midi_cc(64, 0)  # Sustain pedal off
+        # Full channel volume stands in for the old stacked "amplified" voices
+        self.theremin.send_midi_cc(7, 1.0)
 
     def update_pitch_range(self, start_key: float, octave_range: int):
         """Update the pitch range and regenerate pitch pool."""
+        if start_key == self.start_key and octave_range == self.octave_range:
+            return
+
         self.start_key = start_key
         self.octave_range = octave_range
         self.pitch_range = (start_key, start_key + octave_range * 12)
+        self._update_range_mapping()
+        self._prev_hand_input = None  # same hand position, new targets
         # self.pitch_pool = self._generate_pitch_pool(self.scale_name)
 
-    @staticmethod
-    def _map_range(
-        value: float, in_min: float, in_max: float, out_min: float, out_max: float
-    ) -> float:
-        """Map a value from one range to another."""
-        # Clamp input value
-        value = max(in_min, min(in_max, value))
-
-        # Map to output range
-        return out_min + (value - in_min) * (out_max - out_min) / (in_max - in_min)
-
-    @staticmethod
-    def _smooth_value(current: float, target: float, smoothing: float) -> float:
-        """Apply smoothing to value changes."""
-        return current + (target - current) * smoothing
-
-    @staticmethod
-    def _get_scale_index(current: float) -> int:
-        return int(current)
-
-    @staticmethod
-    def _round_value(current: float) -> int:
-        return int(current)
+    def _update_range_mapping(self):
+        """Precompute the linear maps from hand position to pitch and volume.
+
+        Each map is reduced to value = a * position + b, so the per-frame
+        mapping is one clamp and one multiply-add.
+        """
+        # Pitch spans the pitch region of the frame
+        self._pitch_scale = (
+            self.pitch_range[1] - self.pitch_range[0]
+        ) / PITCH_REGION_WIDTH
+        self._pitch_offset = (
+            self.pitch_range[0] - PITCH_REGION_START * self._pitch_scale
+        )
+        # Volume spans the lower half of the frame (palm y 1.0 - 0.5), rising
+        # as the palm moves up
+        self._volume_scale = -(self.volume_range[1] - self.volume_range[0]) / 0.5
+        self._volume_offset = self.volume_range[0] - self._volume_scale
+
+    def _map_pitch(self, x: float) -> float:
+        """Map a horizontal hand position to a continuous pitch."""
+        lo = PITCH_REGION_START
+        hi = PITCH_REGION_END
+        x = lo if x < lo else hi if x > hi else x
+        return x * self._pitch_scale + self._pitch_offset
+
+    def _map_volume(self, palm_y: float) -> float:
+        """Map a vertical palm position to a volume."""
+        palm_y = 0.5 if palm_y < 0.5 else 1.0 if palm_y > 1.0 else palm_y
+        return palm_y * self._volume_scale + self._volume_offset
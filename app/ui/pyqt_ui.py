@@ -1,9 +1,19 @@
-from typing import Callable, Optional
+import threading
+from typing import Callable, Optional, Tuple, cast
 
 import cv2
 import numpy as np
-from PyQt6.QtCore import Qt, QTimer, pyqtSignal
-from PyQt6.QtGui import QCloseEvent, QCursor, QImage, QPixmap
+from PyQt6 import sip
+from PyQt6.QtCore import QEvent, QObject, Qt, QTimer, pyqtSignal, pyqtSlot
+from PyQt6.QtGui import (
+    QCloseEvent,
+    QCursor,
+    QGuiApplication,
+    QHideEvent,
+    QImage,
+    QPixmap,
+    QShowEvent,
+)
 from PyQt6.QtWidgets import (
     QApplication,
     QCheckBox,
@@ -21,9 +31,55 @@ from PyQt6.QtWidgets import (
 
 from app.music import DEFAULT_GLIDE_MODE, INSTRUMENTS, get_scale_names
 
+DEFAULT_REFRESH_RATE = 60.0  # Hz, when the screen doesn't report one
+SETTINGS_DEBOUNCE_MS = 50  # minimum gap between settings callbacks
+AUDIO_PARAMS_REFRESH_MS = 100  # pitch/volume readout update interval
+
+
+def _build_error_pattern(height: int, width: int) -> np.ndarray:
+    """Red BGR image with a white striped band, shown when display fails."""
+    error_image = np.zeros((height, width, 3), dtype=np.uint8)
+    error_image[..., 2] = 255  # red background (BGR)
+
+    # Error stripes
+    ys, xs = np.ogrid[100:150, 100:400]
+    error_image[100:150, 100:400][(xs + ys) % 4 == 0] = 255  # white stripes
+    return error_image
+
+
+_ERROR_PATTERN = _build_error_pattern(600, 800)  # camera preview size
+
+# One stylesheet for the whole window, parsed once; widgets opt in by object name
+WINDOW_STYLESHEET = """
+    QPushButton#helpButton {
+        background: transparent;
+        border: none;
+        padding: 0;
+        margin: 0;
+        font-size: 20px;
+    }
+    QPushButton#helpButton:hover {
+        color: #FF9800;
+    }
+    QPushButton#exitButton {
+        background-color: #FF9800;
+        color: white;
+        font-weight: bold;
+        border-radius: 12px;
+        font-size: 14px;
+    }
+    QPushButton#exitButton:hover {
+        background-color: #ffa733;
+    }
+    QLabel#cameraLabel {
+        border: 2px solid #ccc;
+        background-color: #000;
+    }
+"""
+
 
 class VelomaUI(QMainWindow):
-    camera_frame_signal = pyqtSignal(object)
+    _camera_frame_ready = pyqtSignal()
 
     def __init__(self):
         super().__init__()
@@ -54,7 +110,39 @@ class VelomaUI(QMainWindow):
         self.volume_value_label: Optional[QLabel] = None
         self.smoothing_value_label: Optional[QLabel] = None
 
-        self.camera_frame_signal.connect(self.update_camera_frame)
+        # Label size camera frames are scaled to, readable from any thread
+        self._preview_size: Tuple[int, int] = (self.camera_width, self.camera_height)
+        # Whether the window is shown and not minimized; kept up to date on the
+        # UI thread so the capture thread can skip scaling frames nobody sees
+        self._window_visible = False
+
+        # Camera frames are painted at most once per screen refresh; frames
+        # arriving in between replace the pending one
+        self._pending_frame: Optional[np.ndarray] = None
+        self._frame_throttle = QTimer(self)
+        self._frame_throttle.setSingleShot(True)
+        self._frame_throttle.timeout.connect(self._flush_pending_frame)
+
+        # Frames handed over from the capture thread, already scaled; only the
+        # latest is kept, so a slow UI never builds up a backlog of queued frames
+        self._incoming_frame: Optional[np.ndarray] = None
+        self._incoming_frame_lock = threading.Lock()
+        self._camera_frame_ready.connect(self._take_incoming_frame)
+
+        # Settings changes reach the callback at most every SETTINGS_DEBOUNCE_MS
+        # while a slider is dragged; the last change is always delivered
+        self._settings_pending = False
+        self._settings_throttle = QTimer(self)
+        self._settings_throttle.setSingleShot(True)
+        self._settings_throttle.setInterval(SETTINGS_DEBOUNCE_MS)
+        self._settings_throttle.timeout.connect(self._flush_pending_settings)
+
+        # Pitch/volume readouts refresh at a readable rate, not per frame
+        self._shown_pitch_text = ""
+        self._shown_volume_text = ""
+        self._audio_params_timer = QTimer(self)
+        self._audio_params_timer.timeout.connect(self._refresh_audio_params)
+        self._audio_params_timer.start(AUDIO_PARAMS_REFRESH_MS)
 
         self.setup()
 
@@ -63,6 +151,7 @@ class VelomaUI(QMainWindow):
         self.setWindowTitle("Veloma - Virtual Theremin")
         self.setGeometry(100, 100, self.window_width, self.window_height)
         self.setMinimumSize(1200, 800)
+        self.setStyleSheet(WINDOW_STYLESHEET)
 
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
@@ -153,18 +242,7 @@ class VelomaUI(QMainWindow):
         help_btn.setToolTip("Show Instructions")
         help_btn.setCursor(QCursor(Qt.CursorShape.PointingHandCursor))
         help_btn.setFixedSize(32, 32)
-        help_btn.setStyleSheet("""
-            QPushButton {
-                background: transparent;
-                border: none;
-                padding: 0;
-                margin: 0;
-                font-size: 20px;
-            }
-            QPushButton:hover {
-                color: #FF9800;
-            }
-        """)
+        help_btn.setObjectName("helpButton")
         help_btn.clicked.connect(self._show_help_modal)
         toolbar.addWidget(help_btn)
 
@@ -172,18 +250,7 @@ class VelomaUI(QMainWindow):
         exit_button = QPushButton("Exit")
         exit_button.setFixedSize(80, 32)
         exit_button.clicked.connect(self._on_exit_clicked)
-        exit_button.setStyleSheet("""
-            QPushButton {
-                background-color: #FF9800;
-                color: white;
-                font-weight: bold;
-                border-radius: 12px;
-                font-size: 14px;
-            }
-            QPushButton:hover {
-                background-color: #ffa733;
-            }
-        """)
+        exit_button.setObjectName("exitButton")
         exit_button.setCursor(QCursor(Qt.CursorShape.PointingHandCursor))
         toolbar.addWidget(exit_button)
 
@@ -197,10 +264,9 @@ class VelomaUI(QMainWindow):
         self.camera_label.setSizePolicy(
             QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding
         )
-        self.camera_label.setStyleSheet(
-            "border: 2px solid #ccc; background-color: #000;"
-        )
+        self.camera_label.setObjectName("cameraLabel")
         self.camera_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.camera_label.installEventFilter(self)
         camera_layout.addWidget(self.camera_label)
 
         # pitch/volume display at the bottom
@@ -219,6 +285,7 @@ class VelomaUI(QMainWindow):
         camera_layout.addStretch()
         parent_layout.addLayout(camera_layout)
 
+    @pyqtSlot()
     def _show_help_modal(self):
         from PyQt6.QtWidgets import QDialog, QLabel, QPushButton, QVBoxLayout
 
@@ -249,43 +316,64 @@ class VelomaUI(QMainWindow):
         dialog.exec()
 
     def _display_image(self, image):
-        """Display an image in the camera label."""
+        """Display a BGR image (OpenCV's channel order) in the camera label."""
+        if self.camera_label is None:
+            return
         try:
-            height, width, channel = image.shape
-            bytes_per_line = 3 * width
-            q_image = QImage(
-                image.data, width, height, bytes_per_line, QImage.Format.Format_RGB888
-            )
-            pixmap = QPixmap.fromImage(q_image)
-            if self.camera_label:
-                label_width = self.camera_label.width()
-                label_height = self.camera_label.height()
-                scaled_pixmap = pixmap.scaled(
-                    label_width,
-                    label_height,
-                    Qt.AspectRatioMode.KeepAspectRatio,
-                    Qt.TransformationMode.SmoothTransformation,
-                )
-                self.camera_label.setPixmap(scaled_pixmap)
+            self._show_preview_image(self._to_preview_image(image, self._preview_size))
         except Exception as e:
             print(f"Error displaying image: {e}")
             self._show_error_pattern()
 
-    def _show_error_pattern(self):
-        """Show error pattern when image display fails."""
-        error_image = np.zeros(
-            (self.camera_height, self.camera_width, 3), dtype=np.uint8
+    @staticmethod
+    def _to_preview_image(image: np.ndarray, size: Tuple[int, int]) -> np.ndarray:
+        """Resize a BGR frame to fit within size, keeping its aspect ratio.
+
+        Doesn't touch Qt, so it's safe to call off the UI thread.
+        """
+        height, width = image.shape[:2]
+        scale = min(size[0] / width, size[1] / height)
+        fit_width = max(1, int(width * scale))
+        fit_height = max(1, int(height * scale))
+        if (fit_width, fit_height) != (width, height):
+            # Area averaging for downscaling, bilinear for upscaling
+            interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR
+            image = cv2.resize(
+                image, (fit_width, fit_height), interpolation=interpolation
+            )
+        else:
+            # The caller may reuse its buffer, so the preview gets its own
+            image = image.copy()
+        return image
+
+    def _show_preview_image(self, image: np.ndarray):
+        label = self.camera_label
+        if label is None:
+            return
+        height, width, channel = image.shape
+        bytes_per_line = 3 * width
+        # QImage only wraps the (C-contiguous) buffer, through the voidptr its
+        # constructor is declared to take. fromImage shares it too when no
+        # format conversion is needed, so copy() gives the pixmap pixels that
+        # outlive image
+        q_image = QImage(
+            sip.voidptr(image.ctypes.data),
+            width,
+            height,
+            bytes_per_line,
+            QImage.Format.Format_BGR888,
+        )
+        label.setPixmap(
+            QPixmap.fromImage(
+                q_image.copy(), Qt.ImageConversionFlag.NoFormatConversion
+            )
         )
-        error_image[:, :] = [255, 0, 0]  # red background
-
-        # Error stripes
-        for y in range(100, 150):
-            for x in range(100, 400):
-                if (x + y) % 4 == 0:
-                    error_image[y, x] = [255, 255, 255]  # white stripes
 
-        self._display_image(error_image)
+    def _show_error_pattern(self):
+        """Show error pattern when image display fails."""
+        self._display_image(_ERROR_PATTERN)
 
+    @pyqtSlot()
     def start_application(self):
         if self.on_start_callback:
             try:
@@ -294,10 +382,12 @@ class VelomaUI(QMainWindow):
             except Exception as e:
                 print(f"Auto-start failed: {e}")
 
+    @pyqtSlot()
     def _on_exit_clicked(self):
         """Handle exit button click."""
         self.stop()
 
+    @pyqtSlot()
     def _on_settings_changed(self):
         """Handle settings slider changes."""
         if self.start_key_value_label and self.start_key_slider:
@@ -305,6 +395,24 @@ class VelomaUI(QMainWindow):
         if self.octave_range_value_label and self.octave_range_slider:
             self.octave_range_value_label.setText(f"{self.octave_range_slider.value()}")
 
+        self.scale_combo.setEnabled(not self.glide_checkbox.isChecked())
+        self.instrument_combo.setEnabled(not self.glide_checkbox.isChecked())
+
+        if self._settings_throttle.isActive():
+            self._settings_pending = True
+            return
+        self._emit_settings()
+        self._settings_throttle.start()
+
+    @pyqtSlot()
+    def _flush_pending_settings(self):
+        if self._settings_pending:
+            self._settings_pending = False
+            self._emit_settings()
+            self._settings_throttle.start()
+
+    def _emit_settings(self):
+        """Send the current settings to the settings callback."""
         if (
             self.on_settings_change_callback
             and self.start_key_slider
@@ -322,36 +430,124 @@ class VelomaUI(QMainWindow):
             }
             self.on_settings_change_callback(settings)
 
-        self.scale_combo.setEnabled(not self.glide_checkbox.isChecked())
-        self.instrument_combo.setEnabled(not self.glide_checkbox.isChecked())
+    def submit_camera_frame(self, frame: Optional[np.ndarray]):
+        """Hand a camera frame to the UI from any thread.
 
-    def update_camera_frame(self, frame: Optional[np.ndarray]):
-        """Update the camera preview with new frame."""
+        The frame is scaled to the preview size on the calling thread, and
+        replaces a frame the UI hasn't picked up yet instead of queueing it.
+        """
+        if frame is None or frame.size == 0 or not self._window_visible:
+            return
+        # Runs on the capture thread: only OpenCV failures are expected here,
+        # anything else is a bug and should surface
+        try:
+            preview = self._to_preview_image(frame, self._preview_size)
+        except cv2.error as e:
+            print(f"Camera frame update error: {e}")
+            return
+        with self._incoming_frame_lock:
+            notify = self._incoming_frame is None
+            self._incoming_frame = preview
+        if notify:
+            self._camera_frame_ready.emit()
+
+    @pyqtSlot()
+    def _take_incoming_frame(self):
+        with self._incoming_frame_lock:
+            frame, self._incoming_frame = self._incoming_frame, None
+        self._queue_camera_frame(frame)
+
+    def _queue_camera_frame(self, frame: Optional[np.ndarray]):
+        """Show a frame now, or hold it until the next screen refresh."""
         if frame is None:
             return
-
+        if self._frame_throttle.isActive():
+            self._pending_frame = frame  # latest wins
+            return
+        self._paint_camera_frame(frame)
+        self._frame_throttle.start(self._frame_interval_ms())
+
+    @pyqtSlot()
+    def _flush_pending_frame(self):
+        frame, self._pending_frame = self._pending_frame, None
+        if frame is not None:
+            self._paint_camera_frame(frame)
+            self._frame_throttle.start(self._frame_interval_ms())
+
+    def _paint_camera_frame(self, frame: np.ndarray):
+        if self._preview_hidden():
+            return
         try:
-            # Convert BGR to RGB (OpenCV uses BGR by default)
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            self._display_image(rgb_frame)
+            self._show_preview_image(frame)
         except Exception as e:
             print(f"Camera frame update error: {e}")
             self._show_error_pattern()
 
+    def _preview_hidden(self) -> bool:
+        # Nothing to paint into before setup, or while minimized or hidden
+        label = self.camera_label
+        return label is None or self.isMinimized() or not label.isVisible()
+
+    def eventFilter(self, a0: Optional[QObject], a1: Optional[QEvent]) -> bool:
+        if (
+            a0 is self.camera_label
+            and a1 is not None
+            and a1.type() == QEvent.Type.Resize
+        ):
+            label = cast(QLabel, a0)
+            self._preview_size = (label.width(), label.height())
+        return super().eventFilter(a0, a1)
+
+    def _update_window_visible(self):
+        self._window_visible = self.isVisible() and not self.isMinimized()
+
+    def changeEvent(self, a0: Optional[QEvent]):
+        if a0 is not None and a0.type() == QEvent.Type.WindowStateChange:
+            self._update_window_visible()
+        super().changeEvent(a0)
+
+    def showEvent(self, a0: Optional[QShowEvent]):
+        super().showEvent(a0)
+        self._update_window_visible()
+
+    def hideEvent(self, a0: Optional[QHideEvent]):
+        super().hideEvent(a0)
+        self._window_visible = False
+
+    def _frame_interval_ms(self) -> int:
+        screen = self.screen() or QGuiApplication.primaryScreen()
+        rate = screen.refreshRate() if screen else 0.0
+        if rate <= 0.0:
+            rate = DEFAULT_REFRESH_RATE
+        return max(1, int(1000.0 / rate))
+
     def update_audio_params(self, pitch: float, volume: float):
-        """Update audio parameter displays."""
+        """Record the latest audio parameters; safe to call from any thread.
+
+        The displays pick them up on the next AUDIO_PARAMS_REFRESH_MS tick.
+        """
         self.current_pitch = pitch
         self.current_volume = volume
 
+    @pyqtSlot()
+    def _refresh_audio_params(self):
+        """Update audio parameter displays that have changed."""
+        pitch = self.current_pitch
+        volume = self.current_volume
+
         if self.pitch_slider:
             self.pitch_slider.setValue(int(pitch))
-        if self.pitch_value_label:
-            self.pitch_value_label.setText(f"{pitch:.2f}")
+        pitch_text = f"{pitch:.2f}"
+        if self.pitch_value_label and pitch_text != self._shown_pitch_text:
+            self.pitch_value_label.setText(pitch_text)
+            self._shown_pitch_text = pitch_text
 
         if self.volume_slider:
             self.volume_slider.setValue(int(volume * 100))
-        if self.volume_value_label:
-            self.volume_value_label.setText(f"{volume:.3f}")
+        volume_text = f"{volume:.3f}"
+        if self.volume_value_label and volume_text != self._shown_volume_text:
+            self.volume_value_label.setText(volume_text)
+            self._shown_volume_text = volume_text
 
     def set_callbacks(
         self,
@@ -1,17 +1,20 @@
+import operator
+import sys
 import threading
 import time
-from typing import Any, Dict, Tuple
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
 
 import cv2
 import numpy as np
 from mediapipe import Image as MPImage
 from mediapipe import ImageFormat as MPImageFormat
 from mediapipe.tasks.python.core.base_options import BaseOptions
-from mediapipe.tasks.python.vision import (
-    HandLandmarker,
-    HandLandmarkerOptions,
-    RunningMode,
-)
+from mediapipe.tasks.python.vision import HandLandmarkerOptions, RunningMode
+
+# The class itself: mediapipe's vision package only re-exports it as a
+# module-level alias, which can't be used in annotations
+from mediapipe.tasks.python.vision.hand_landmarker import HandLandmarker
 
 HAND_CONNECTIONS = [
     (0, 1),
@@ -37,29 +40,149 @@ HAND_CONNECTIONS = [
 ]
 FINGER_TIPS = [4, 8, 12, 16, 20]
 
+# Capture settings: small enough for MediaPipe to keep up, and never queue
+# more than one frame so read() always returns the newest one
+CAMERA_FRAME_WIDTH = 640
+CAMERA_FRAME_HEIGHT = 480
+CAMERA_FPS = 30
+CAMERA_BUFFER_SIZE = 1
+MAX_DETECTION_FPS = 30  # frames sent to MediaPipe per second, at most
+# Slightly under the frame period, so frame jitter at the target rate doesn't
+# make every other frame look early
+DETECTION_INTERVAL = 0.8 / MAX_DETECTION_FPS
+# Mirrored frames handed to callbacks rotate through this many buffers, so a
+# delivered frame stays untouched for this many frames afterwards
+FRAME_RING_SIZE = 4
+CAMERA_WAIT_TIMEOUT = 0.1  # seconds the idle capture thread sleeps at a time
+GRAB_RETRY_DELAY = 0.01  # seconds to wait after a failed grab()
+# The hand models work on ~200px inputs, so wider frames are shrunk to this
+# width before detection; landmarks are normalized and still fit the frame
+DETECTION_MAX_WIDTH = 640
+
+MIN_DETECTION_CONFIDENCE = 0.5
+MIN_TRACKING_CONFIDENCE = 0.5
+
+# Frames where the area around the last detected hands hasn't changed reuse
+# those hands instead of running inference again
+STATIC_THUMB_SIZE = (32, 32)  # grayscale thumbnail of the hands' area
+STATIC_HAND_PADDING = 0.25  # of the hands' box size, added on each side
+STATIC_MEAN_DIFF = 0.75  # mean absolute thumbnail difference, in gray levels
+MAX_STATIC_INTERVAL = 0.05  # seconds (about one frame) before detecting anyway
+STATIC_SAD = STATIC_MEAN_DIFF * STATIC_THUMB_SIZE[0] * STATIC_THUMB_SIZE[1]
+
+# Reads (x, y, z) off a landmark in one C-level call
+_landmark_xyz = operator.attrgetter("x", "y", "z")
+
+
+def _landmarks_to_array(landmarks) -> np.ndarray:
+    """Copy MediaPipe landmarks into a (N, 3) float32 array."""
+    return np.array(list(map(_landmark_xyz, landmarks)), dtype=np.float32)
+
+
+@dataclass(slots=True)
+class Hand:
+    """A single tracked hand, in normalized image coordinates.
+
+    landmarks is a (21, 3) float32 array of MediaPipe's x, y, z per landmark.
+    """
+
+    landmarks: np.ndarray
+    palm_center: Tuple[float, float]
+    rightmost_x: float
+    hand_index: int
+    trigger_gesture: bool = False
+
+
+@dataclass(slots=True)
+class HandFrame:
+    """Tracking result for one camera frame."""
+
+    frame: Optional[np.ndarray]
+    timestamp: int
+    hands: List[Hand] = field(default_factory=list)
+
 
 class HandTracker:
     def __init__(self, model_path="app/vision/hand_landmarker.task"):
         self.cap = None
         self.is_running = False
+        # Set while the camera is open, so the capture thread can sleep on it
+        self._camera_ready = threading.Event()
         self._thread = None
         self._async_stop = False
         self._on_hand_data = None
+        # Per-frame scratch buffers that never leave the capture thread
+        self._raw_buf: Optional[np.ndarray] = None
+        self._small_buf: Optional[np.ndarray] = None
+        self._rgb_buf: Optional[np.ndarray] = None
+        # Hands of the last frame inference actually ran on, with the pixel
+        # box around them and its thumbnail (None when no hands were found)
+        self._detected_box: Optional[Tuple[int, int, int, int]] = None
+        self._detected_thumb: Optional[np.ndarray] = None
+        self._detected_hands: List[Hand] = []
+        # Buffers for the mirrored frames that are handed out to callbacks
+        self._frame_ring: List[Optional[np.ndarray]] = [None] * FRAME_RING_SIZE
+        self._frame_index = 0
+        # Note boundary line endpoints, keyed by layout and frame size
+        self._boundary_lines: Dict[
+            Tuple[int, int, int, float, float], List[np.ndarray]
+        ] = {}
+
+        # Loading the model takes a while, so it waits until the camera starts
+        self.model_path = model_path
+        self.hand_landmarker: Optional[HandLandmarker] = None
+        self._on_gpu = False  # whether hand_landmarker uses the GPU delegate
+
+    def _load_landmarker(self):
+        # Run inference on the GPU where MediaPipe supports it, else the CPU
+        try:
+            self.hand_landmarker = self._create_landmarker(
+                self.model_path, BaseOptions.Delegate.GPU
+            )
+            self._on_gpu = True
+        except Exception as e:
+            print(f"GPU hand tracking unavailable, using CPU: {e}")
+            self._load_cpu_landmarker()
 
+    def _load_cpu_landmarker(self) -> HandLandmarker:
+        landmarker = self._create_landmarker(self.model_path, BaseOptions.Delegate.CPU)
+        self.hand_landmarker = landmarker
+        self._on_gpu = False
+        return landmarker
+
+    def _create_landmarker(self, model_path, delegate) -> HandLandmarker:
         options = HandLandmarkerOptions(
-            base_options=BaseOptions(model_asset_path=model_path),
-            running_mode=RunningMode.LIVE_STREAM,
-            result_callback=self._result_callback,
+            base_options=BaseOptions(model_asset_path=model_path, delegate=delegate),
+            # Synchronous per-frame detection: the loop always feeds the newest
+            # frame, so an async result queue would only add a thread hop
+            running_mode=RunningMode.VIDEO,
             num_hands=2,
+            # In VIDEO mode the landmarks of the previous frame give the hand
+            # region for the next one; the palm detector only runs again when
+            # tracking confidence drops below this (or a hand is missing)
+            min_tracking_confidence=MIN_TRACKING_CONFIDENCE,
+            min_hand_detection_confidence=MIN_DETECTION_CONFIDENCE,
         )
-        self.hand_landmarker = HandLandmarker.create_from_options(options)
+        return HandLandmarker.create_from_options(options)
 
     def start_camera(self) -> bool:
         try:
-            self.cap = cv2.VideoCapture(0)
+            if self.hand_landmarker is None:
+                self._load_landmarker()
+            self.cap = None
+            if sys.platform.startswith("linux"):
+                # The V4L2 backend honours CAP_PROP_BUFFERSIZE
+                self.cap = cv2.VideoCapture(0, cv2.CAP_V4L2)
+            if self.cap is None or not self.cap.isOpened():
+                self.cap = cv2.VideoCapture(0)
             if not self.cap.isOpened():
                 return False
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, CAMERA_BUFFER_SIZE)
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, CAMERA_FRAME_WIDTH)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, CAMERA_FRAME_HEIGHT)
+            self.cap.set(cv2.CAP_PROP_FPS, CAMERA_FPS)
             self.is_running = True
+            self._camera_ready.set()
             return True
         except Exception as e:
             print(f"Failed to start camera: {e}")
@@ -67,15 +190,28 @@ class HandTracker:
 
     def stop_camera(self):
         self.is_running = False
+        self._camera_ready.clear()
         if self.cap:
             self.cap.release()
             self.cap = None
-        if self.hand_landmarker:
+        # The capture thread may still be inside detect_for_video() if
+        # stop_async() timed out; the landmarker then stays open for reuse
+        capture_running = self._thread is not None and self._thread.is_alive()
+        if self.hand_landmarker and not capture_running:
+            # Closed landmarkers can't be reused; the next start loads a new one
             self.hand_landmarker.close()
+            self.hand_landmarker = None
 
     def start_async(self, on_hand_data):
         if self._thread and self._thread.is_alive():
-            return
+            if not self._async_stop:
+                return  # already running
+            # A stop_async() that timed out: let that thread finish its frame
+            # first, so two threads never share the camera and landmarker
+            self._thread.join(timeout=2.0)
+            if self._thread.is_alive():
+                print("Hand tracking thread is still stopping; not restarted")
+                return
         self._async_stop = False
         self._on_hand_data = on_hand_data
         self._thread = threading.Thread(target=self._async_loop)
@@ -86,82 +222,179 @@ class HandTracker:
         self._async_stop = True
         if self._thread:
             self._thread.join(timeout=2.0)
-            self._thread = None
+            if not self._thread.is_alive():
+                self._thread = None
 
     def _async_loop(self):
+        last_detect = 0.0
+        last_inference = 0.0
         while not self._async_stop:
-            if not self.cap or not self.is_running:
-                time.sleep(0.01)
+            # Local references: stop_camera() may clear these while a frame is
+            # in flight
+            cap = self.cap
+            landmarker = self.hand_landmarker
+            if not cap or not landmarker or not self.is_running:
+                # Wake as soon as the camera opens; the timeout only bounds
+                # how long stop_async() waits
+                self._camera_ready.wait(CAMERA_WAIT_TIMEOUT)
+                continue
+            # grab() waits for the next frame without decoding it; only frames
+            # that will actually be detected on are decoded
+            if not cap.grab():
+                # Camera hiccup or unplugged: back off instead of spinning
+                time.sleep(GRAB_RETRY_DELAY)
                 continue
-            ret, frame = self.cap.read()
+            now = time.monotonic()
+            if now - last_detect < DETECTION_INTERVAL:
+                continue
+            ret, raw = cap.retrieve(self._raw_buf)
             if not ret:
-                time.sleep(0.01)
                 continue
-            frame = cv2.flip(frame, 1)
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            timestamp_ms = int(time.time() * 1000)
-            # Store frame for callback
-            self._latest_frame = frame
-            mp_image = MPImage(image_format=MPImageFormat.SRGB, data=rgb_frame)
-            self.hand_landmarker.detect_async(mp_image, timestamp_ms)
-            time.sleep(0.01)
-
-    def _result_callback(self, result, output_image, timestamp_ms):
-        hand_data = {
-            "frame": getattr(self, "_latest_frame", None),
-            "hands": [],
-            "timestamp": timestamp_ms,
-        }
+            self._raw_buf = raw
+            last_detect = now
+            # Callbacks may hold on to the mirrored frame for a little while,
+            # so it goes into the oldest ring slot rather than a single buffer
+            self._frame_index = (self._frame_index + 1) % FRAME_RING_SIZE
+            frame = cv2.flip(raw, 1, dst=self._frame_ring[self._frame_index])
+            self._frame_ring[self._frame_index] = frame
+
+            # Compare against the last detected frame, not the previous one, so
+            # slow movement still adds up to a new detection. Without hands
+            # there is nothing to compare, and a hand may enter anywhere.
+            box = self._detected_box
+            thumb = self._detected_thumb
+            if (
+                box is not None
+                and thumb is not None
+                and now - last_inference < MAX_STATIC_INTERVAL
+                and cv2.norm(self._box_thumb(frame, box), thumb, cv2.NORM_L1)
+                < STATIC_SAD
+            ):
+                self._deliver(
+                    HandFrame(
+                        frame=frame,
+                        timestamp=int(now * 1000),
+                        hands=list(self._detected_hands),
+                    )
+                )
+                continue
+
+            detect_frame = frame
+            frame_h, frame_w = frame.shape[:2]
+            if frame_w > DETECTION_MAX_WIDTH:
+                size = (
+                    DETECTION_MAX_WIDTH,
+                    round(frame_h * DETECTION_MAX_WIDTH / frame_w),
+                )
+                detect_frame = self._small_buf = cv2.resize(
+                    frame, size, dst=self._small_buf, interpolation=cv2.INTER_AREA
+                )
+            if self._rgb_buf is None or self._rgb_buf.shape != detect_frame.shape:
+                self._rgb_buf = np.empty_like(detect_frame)
+            cv2.cvtColor(detect_frame, cv2.COLOR_BGR2RGB, dst=self._rgb_buf)
+            # VIDEO mode needs strictly increasing timestamps
+            timestamp_ms = int(now * 1000)
+            # MPImage copies the pixels, so the RGB buffer is free to reuse
+            mp_image = MPImage(image_format=MPImageFormat.SRGB, data=self._rgb_buf)
+            try:
+                result = landmarker.detect_for_video(mp_image, timestamp_ms)
+            except Exception as e:
+                # Some GPU delegates load fine and only fail once they run
+                if not self._on_gpu:
+                    raise
+                print(f"GPU hand tracking failed, switching to CPU: {e}")
+                try:
+                    landmarker.close()
+                except Exception:
+                    pass
+                landmarker = self._load_cpu_landmarker()
+                result = landmarker.detect_for_video(mp_image, timestamp_ms)
+            last_inference = now
+            hand_data = self._parse_result(result, frame, timestamp_ms)
+            # Thumbnail the frame before delivery; callbacks draw on it in place
+            box = self._hands_box(hand_data.hands, frame.shape)
+            self._detected_hands = hand_data.hands
+            self._detected_box = box
+            self._detected_thumb = (
+                self._box_thumb(frame, box) if box is not None else None
+            )
+            self._deliver(hand_data)
+
+    @staticmethod
+    def _hands_box(
+        hands: List[Hand], shape: Tuple[int, ...]
+    ) -> Optional[Tuple[int, int, int, int]]:
+        """Padded pixel box (x0, y0, x1, y1) around all hands, or None."""
+        if not hands:
+            return None
+        points = np.concatenate([hand.landmarks[:, :2] for hand in hands])
+        lo = points.min(axis=0)
+        hi = points.max(axis=0)
+        pad = (hi - lo) * STATIC_HAND_PADDING
+        h, w = shape[:2]
+        x0, y0 = ((lo - pad).clip(0.0, 1.0) * (w, h)).astype(int)
+        x1, y1 = ((hi + pad).clip(0.0, 1.0) * (w, h)).astype(int)
+        if x1 <= x0 or y1 <= y0:
+            return None
+        return int(x0), int(y0), int(x1), int(y1)
+
+    @staticmethod
+    def _box_thumb(frame: np.ndarray, box: Tuple[int, int, int, int]) -> np.ndarray:
+        x0, y0, x1, y1 = box
+        gray = cv2.cvtColor(frame[y0:y1, x0:x1], cv2.COLOR_BGR2GRAY)
+        return cv2.resize(gray, STATIC_THUMB_SIZE, interpolation=cv2.INTER_AREA)
+
+    def _parse_result(self, result, frame: np.ndarray, timestamp_ms: int) -> HandFrame:
+        hand_data = HandFrame(frame=frame, timestamp=timestamp_ms)
         if result and result.hand_landmarks:
             for idx, landmarks in enumerate(result.hand_landmarks):
-                landmark_list = []
-                for landmark in landmarks:
-                    landmark_list.append(
-                        {"x": landmark.x, "y": landmark.y, "z": landmark.z}
-                    )
-                palm_center = self._calculate_palm_center(landmark_list)
-                rightmost_x = max(lm["x"] for lm in landmark_list)
-                hand_info = {
-                    "landmarks": landmark_list,
-                    "palm_center": palm_center,
-                    "rightmost_x": rightmost_x,
-                    "hand_index": idx,
-                }
-                hand_info["trigger_gesture"] = self.is_fingertip_near_palm(hand_info)
-                hand_data["hands"].append(hand_info)
+                # A fresh array per hand: the frame is handed to other threads
+                # that may still hold the previous one
+                landmark_arr = _landmarks_to_array(landmarks)
+                palm_center = self._calculate_palm_center(landmark_arr)
+                hand_info = Hand(
+                    landmarks=landmark_arr,
+                    palm_center=palm_center,
+                    rightmost_x=float(landmark_arr[:, 0].max()),
+                    hand_index=idx,
+                )
+                hand_info.trigger_gesture = self.is_fingertip_near_palm(hand_info)
+                hand_data.hands.append(hand_info)
+        return hand_data
+
+    def _deliver(self, hand_data: HandFrame):
         if self._on_hand_data:
             self._on_hand_data(hand_data)
 
-    def _calculate_palm_center(self, landmarks) -> Tuple[float, float]:
-        wrist = landmarks[0]
-        middle_mcp = landmarks[9]
-        center_x = (wrist["x"] + middle_mcp["x"]) / 2
-        center_y = (wrist["y"] + middle_mcp["y"]) / 2
+    def _calculate_palm_center(self, landmarks: np.ndarray) -> Tuple[float, float]:
+        # Midpoint of the wrist (0) and middle finger MCP (9)
+        center_x = (float(landmarks[0, 0]) + float(landmarks[9, 0])) / 2
+        center_y = (float(landmarks[0, 1]) + float(landmarks[9, 1])) / 2
         return (center_x, center_y)
 
-    def draw_landmarks(self, frame, hand_data: Dict[str, Any]) -> np.ndarray:
+    def draw_landmarks(self, frame, hand_data: HandFrame) -> np.ndarray:
         return frame  # don't draw landmarks for now
-        # if not hand_data or not hand_data["hands"]:
+        # if not hand_data or not hand_data.hands:
         #     return frame
 
         # h, w, _ = frame.shape
         # overlay = frame.copy()
 
-        # for hand_info in hand_data["hands"]:
-        #     landmarks = hand_info["landmarks"]
+        # for hand_info in hand_data.hands:
+        #     landmarks = hand_info.landmarks
 
         #     # Draw connections on overlay
         #     for start_idx, end_idx in HAND_CONNECTIONS:
-        #         x1 = int(landmarks[start_idx]["x"] * w)
-        #         y1 = int(landmarks[start_idx]["y"] * h)
-        #         x2 = int(landmarks[end_idx]["x"] * w)
-        #         y2 = int(landmarks[end_idx]["y"] * h)
+        #         x1 = int(landmarks[start_idx, 0] * w)
+        #         y1 = int(landmarks[start_idx, 1] * h)
+        #         x2 = int(landmarks[end_idx, 0] * w)
+        #         y2 = int(landmarks[end_idx, 1] * h)
         #         cv2.line(overlay, (x1, y1), (x2, y2), (0, 255, 255), 2, cv2.LINE_AA)
 
         #     # Draw landmarks
         #     for idx, landmark in enumerate(landmarks):
-        #         x = int(landmark["x"] * w)
-        #         y = int(landmark["y"] * h)
+        #         x = int(landmark[0] * w)
+        #         y = int(landmark[1] * h)
         #         if idx in FINGER_TIPS:
         #             color = (0, 128, 255)  # orange for fingertips
         #             radius = 7
@@ -171,7 +404,7 @@ class HandTracker:
         #         cv2.circle(overlay, (x, y), radius, color, -1, cv2.LINE_AA)
 
         #     # Draw palm center
-        #     palm_x, palm_y = hand_info["palm_center"]
+        #     palm_x, palm_y = hand_info.palm_center
         #     palm_pixel_x = int(palm_x * w)
         #     palm_pixel_y = int(palm_y * h)
         #     cv2.circle(
@@ -186,20 +419,24 @@ class HandTracker:
         self, frame, num_notes, region_start=0.5, region_end=0.9, color=(255, 255, 255)
     ):
         h, w, _ = frame.shape
-        region_width = region_end - region_start
-        block_width = region_width / num_notes
-        for i in range(num_notes + 1):
-            x_norm = region_start + i * block_width
-            x_px = int(x_norm * w)
-            cv2.line(frame, (x_px, 0), (x_px, h), color, 2)
+        key = (num_notes, w, h, region_start, region_end)
+        lines = self._boundary_lines.get(key)
+        if lines is None:
+            # One vertical two-point line per note boundary
+            x_norm = np.linspace(region_start, region_end, num_notes + 1)
+            x_px = (x_norm * w).astype(np.int32)
+            endpoints = np.empty((num_notes + 1, 2, 2), dtype=np.int32)
+            endpoints[:, :, 0] = x_px[:, None]
+            endpoints[:, 0, 1] = 0
+            endpoints[:, 1, 1] = h
+            lines = list(endpoints)
+            self._boundary_lines[key] = lines
+        cv2.polylines(frame, lines, False, color, 2)
         return frame
 
-    def is_fingertip_near_palm(self, hand_info, threshold=0.08):
+    def is_fingertip_near_palm(self, hand_info: Hand, threshold=0.08):
         # Returns True if any fingertip is close to palm center
-        palm_x, palm_y = hand_info["palm_center"]
-        for tip_idx in [4, 8, 12, 16, 20]:
-            tip = hand_info["landmarks"][tip_idx]
-            dist = ((tip["x"] - palm_x) ** 2 + (tip["y"] - palm_y) ** 2) ** 0.5
-            if dist < threshold:
-                return True
-        return False
+        offsets = hand_info.landmarks[FINGER_TIPS, :2] - hand_info.palm_center
+        # Compare squared distances, no square root needed
+        dist_sq = (offsets * offsets).sum(axis=1)
+        return bool((dist_sq < threshold * threshold).any())
@@ -17,10 +17,21 @@ import sys
 import time
 
 import cv2
+import numpy as np
 
 from app.music import VelomaInstrument
 from app.vision import HandTracker
 
+# Rows at the bottom of the frame covered by the instructions overlay; the
+# first line's baseline is 120 rows up, so this leaves room for its glyphs
+INSTRUCTIONS_HEIGHT = 140
+INSTRUCTIONS = (
+    "Move hand up/down: Pitch",
+    "Move hand left/right: Volume",
+    "SPACE: Toggle audio",
+    "Q: Quit",
+)
+
 
 class VelomaDemo:
     def __init__(self):
@@ -33,9 +44,12 @@ class VelomaDemo:
         self.last_hand_time = 0
         self.hand_hold_timeout = 0.5  # seconds to hold last hand data on dropout
 
+        # Pre-rendered instructions, keyed by the frame width they fit
+        self._instr_overlay = None
+
     def _on_hand_data(self, hand_data):
         self.last_hand_data = hand_data
-        self.last_hand_time = time.time()
+        self.last_hand_time = time.monotonic()
 
     def run(self):
         print("Veloma Demo - Core Functionality Test")
@@ -69,10 +83,10 @@ class VelomaDemo:
 
         try:
             while self.is_running:
-                now = time.time()
+                now = time.monotonic()
                 hand_data = self.last_hand_data
 
-                if hand_data and hand_data.get("hands"):
+                if hand_data and hand_data.hands:
                     use_hand_data = hand_data
                 else:
                     # Use cached hand data only if within timeout
@@ -88,9 +102,9 @@ class VelomaDemo:
                     if self.audio_enabled:
                         self.instrument.update_from_vision(use_hand_data)
                     else:
-                        self.instrument.update_from_vision({"hands": []})
+                        self.instrument.update_from_vision(None)
 
-                    frame = use_hand_data["frame"]
+                    frame = use_hand_data.frame
                     frame_with_landmarks = self.tracker.draw_landmarks(
                         frame, use_hand_data
                     )
@@ -102,7 +116,7 @@ class VelomaDemo:
                     self._print_hand_info(use_hand_data)
                 else:
                     # No valid hand data for too long: force note off
-                    self.instrument.update_from_vision({"hands": []})
+                    self.instrument.update_from_vision(None)
 
                 # Handle keyboard input
                 key = cv2.waitKey(1) & 0xFF
@@ -137,7 +151,7 @@ class VelomaDemo:
         )
 
         # Hand count
-        hand_count = len(hand_data.get("hands", []))
+        hand_count = len(hand_data.hands)
         cv2.putText(
             frame,
             f"Hands: {hand_count}",
@@ -170,36 +184,59 @@ class VelomaDemo:
             2,
         )
 
-        # Instructions
-        instructions = [
-            "Move hand up/down: Pitch",
-            "Move hand left/right: Volume",
-            "SPACE: Toggle audio",
-            "Q: Quit",
-        ]
-
-        start_y = h - 120
-        for i, instruction in enumerate(instructions):
+        # Instructions never change, so they're rendered once per frame width
+        if self._instr_overlay is None or self._instr_overlay[0] != w:
+            # Baselines sit 120, 95, ... rows above the bottom of the frame
+            start_y = INSTRUCTIONS_HEIGHT - 120
+            instruction_lines = [
+                (instruction, (10, start_y + i * 25), 0.5, (200, 200, 200), 1)
+                for i, instruction in enumerate(INSTRUCTIONS)
+            ]
+            self._instr_overlay = (
+                w,
+                self._render_overlay(w, INSTRUCTIONS_HEIGHT, instruction_lines),
+            )
+        self._blit_overlay(frame, h - INSTRUCTIONS_HEIGHT, self._instr_overlay[1])
+
+    @staticmethod
+    def _render_overlay(width, height, lines):
+        """Rasterize text lines into an image and the mask of drawn pixels."""
+        image = np.zeros((height, width, 3), dtype=np.uint8)
+        mask = np.zeros((height, width), dtype=np.uint8)
+        for text, org, scale, color, thickness in lines:
             cv2.putText(
-                frame,
-                instruction,
-                (10, start_y + i * 25),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.5,
-                (200, 200, 200),
-                1,
+                image, text, org, cv2.FONT_HERSHEY_SIMPLEX, scale, color, thickness
             )
+            cv2.putText(
+                mask, text, org, cv2.FONT_HERSHEY_SIMPLEX, scale, (255,), thickness
+            )
+        return image, mask.astype(bool)[..., None]
+
+    @staticmethod
+    def _blit_overlay(frame, top, overlay):
+        """Copy the drawn pixels of an overlay onto the frame at row `top`."""
+        image, mask = overlay
+        skip = max(-top, 0)  # overlay rows above the top of the frame
+        top += skip
+        rows = min(image.shape[0] - skip, frame.shape[0] - top)
+        if rows <= 0:
+            return
+        np.copyto(
+            frame[top : top + rows],
+            image[skip : skip + rows],
+            where=mask[skip : skip + rows],
+        )
 
     def _print_hand_info(self, hand_data):
         """Print hand position info to console."""
-        if not hand_data.get("hands"):
+        if not hand_data.hands:
             return
 
-        hands = hand_data["hands"]
+        hands = hand_data.hands
         info_parts = []
 
         for i, hand in enumerate(hands):
-            palm_x, palm_y = hand["palm_center"]
+            palm_x, palm_y = hand.palm_center
             info_parts.append(f"Hand {i + 1}: ({palm_x:.2f}, {palm_y:.2f})")
 
         # Add current audio parameters
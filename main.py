@@ -7,7 +7,8 @@ from PyQt6.QtWidgets import QApplication
 from app.music import (
     GLIDE_MODE_INSTRUMENT,
     INSTRUMENTS,
-    PITCH_X_MARGIN,
+    PITCH_REGION_END,
+    PITCH_REGION_START,
     VelomaInstrument,
     get_scale_names,
 )
@@ -38,6 +39,7 @@ class VelomaApp:
         self.hand_hold_timeout = 0.5  # seconds to hold last hand data on dropout
 
         self.show_note_boundaries = True
+        self._applied_settings: Dict[str, Any] = {}
 
         self.current_instrument_name = INSTRUMENTS[0]
 
@@ -61,6 +63,12 @@ class VelomaApp:
 
     def _update_settings(self, settings: Dict[str, Any]):
         """Update instrument settings from UI."""
+        # The setters below are idempotent, but a repeat of the last settings
+        # can skip them (and the glide-mode vision refresh) altogether
+        if settings == self._applied_settings:
+            return
+        self._applied_settings = dict(settings)
+
         start_key = settings.get("start_key", 60)
         octave_range = settings.get("octave_range", 2)
         self.instrument.update_pitch_range(start_key, octave_range)
@@ -82,7 +90,7 @@ class VelomaApp:
             if self.current_instrument_name != GLIDE_MODE_INSTRUMENT:
                 self.instrument.set_instrument(GLIDE_MODE_INSTRUMENT)
                 self.current_instrument_name = GLIDE_MODE_INSTRUMENT
-            if self.last_hand_data and self.last_hand_data.get("hands"):
+            if self.last_hand_data and self.last_hand_data.hands:
                 self.instrument.update_from_vision(self.last_hand_data)
         else:
             if self.current_instrument_name != instrument_name:
@@ -90,12 +98,15 @@ class VelomaApp:
                 self.current_instrument_name = instrument_name
 
     def _on_hand_data(self, hand_data):
-        now = time.time()
+        now = time.monotonic()
+        instrument = self.instrument
+        tracker = self.hand_tracker
+        ui = self.ui
         frame = None
         if hand_data:
-            frame = hand_data.get("frame")
+            frame = hand_data.frame
 
-        if hand_data and hand_data.get("hands"):
+        if hand_data and hand_data.hands:
             self.last_hand_data = hand_data
             self.last_hand_time = now
             use_hand_data = hand_data
@@ -110,27 +121,24 @@ class VelomaApp:
                 use_hand_data = None
 
         if hand_data:
-            self.instrument.update_from_vision(use_hand_data)
+            instrument.update_from_vision(use_hand_data)
             if frame is not None:
-                frame_with_landmarks = self.hand_tracker.draw_landmarks(
-                    frame, hand_data
-                )
-                if not self.instrument.glide_mode and self.show_note_boundaries:
-                    num_notes = len(self.instrument.pitch_pool)
-                    region_start = 0.5
-                    region_end = 1.0 - PITCH_X_MARGIN
-                    frame_with_landmarks = self.hand_tracker.draw_note_boundaries(
-                        frame_with_landmarks, num_notes, region_start, region_end
+                frame_with_landmarks = tracker.draw_landmarks(frame, hand_data)
+                if not instrument.glide_mode and self.show_note_boundaries:
+                    num_notes = len(instrument.pitch_pool)
+                    frame_with_landmarks = tracker.draw_note_boundaries(
+                        frame_with_landmarks,
+                        num_notes,
+                        PITCH_REGION_START,
+                        PITCH_REGION_END,
                     )
-                self.ui.camera_frame_signal.emit(frame_with_landmarks)
-            self.ui.update_audio_params(
-                self.instrument.current_pitch, self.instrument.current_volume
-            )
+                ui.submit_camera_frame(frame_with_landmarks)
+            ui.update_audio_params(instrument.current_pitch, instrument.current_volume)
         else:
             # No valid hand data for too long: force note off
-            self.instrument.update_from_vision({"hands": []})
+            instrument.update_from_vision(None)
             if frame is not None:
-                self.ui.camera_frame_signal.emit(frame)
+                ui.submit_camera_frame(frame)
 
     def run(self):
         self.ui.run()